@@ -1,7 +1,46 @@
 from dataclasses import dataclass
+from functools import lru_cache
 import math
 import torch
 
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+
+def _heaviside(
+    v_mem: torch.Tensor, shift: float, inv_threshold: float
+) -> torch.Tensor:
+    return (v_mem >= shift).to(v_mem.dtype) * inv_threshold
+
+
+def _heaviside_tensor_threshold(
+    v_mem: torch.Tensor, spike_threshold: torch.Tensor, window: float
+) -> torch.Tensor:
+    return (v_mem >= spike_threshold - window).to(v_mem.dtype) / spike_threshold
+
+
+def _multi_gaussian(
+    v_mem: torch.Tensor, center: float, two_sigma_sq: float, norm: float
+) -> torch.Tensor:
+    return torch.exp(-((v_mem - center) ** 2) / two_sigma_sq) * norm
+
+
+def _single_exponential(
+    v_mem: torch.Tensor, spike_threshold: float, neg_inv_width: float, norm: float
+) -> torch.Tensor:
+    return torch.exp(torch.abs(v_mem - spike_threshold) * neg_inv_width) * norm
+
+
+@lru_cache(maxsize=None)
+def _scripted(fn):
+    """
+    Scripted version of `fn`, which lets the fuser merge its elementwise chain
+    into a single kernel. Scripting happens on first use so that importing
+    sinabs does not pay for it. Used for scalar thresholds; tensor thresholds
+    (e.g. from ALIF) use the plain python functions above, except for
+    Heaviside which has a dedicated scripted kernel.
+    """
+    return torch.jit.script(fn)
+
 
 @dataclass
 class Heaviside:
@@ -17,7 +56,16 @@ class Heaviside:
     window: float = 1.0
 
     def __call__(self, v_mem, spike_threshold):
-        return ((v_mem >= (spike_threshold - self.window)).float()) / spike_threshold
+        if isinstance(spike_threshold, torch.Tensor):
+            # Shift, compare, cast and scale in one kernel, without
+            # materializing shifted or inverted threshold tensors
+            return _scripted(_heaviside_tensor_threshold)(
+                v_mem, spike_threshold, self.window
+            )
+        spike_threshold = float(spike_threshold)
+        return _scripted(_heaviside)(
+            v_mem, spike_threshold - self.window, 1.0 / spike_threshold
+        )
 
 
 @dataclass
@@ -32,11 +80,17 @@ class MultiGaussian:
     grad_scale: float = 1.0
 
     def __call__(self, v_mem, spike_threshold):
-        return (
-            torch.exp(-(((v_mem - spike_threshold) - self.mu) ** 2) / (2 * self.sigma**2))
-            / torch.sqrt(2 * torch.tensor(math.pi))
-            / self.sigma
-        ) * self.grad_scale
+        if isinstance(spike_threshold, torch.Tensor):
+            fn = _multi_gaussian
+        else:
+            fn = _scripted(_multi_gaussian)
+            spike_threshold = float(spike_threshold)
+        return fn(
+            v_mem,
+            spike_threshold + self.mu,
+            2 * self.sigma**2,
+            self.grad_scale / (_SQRT_2PI * self.sigma),
+        )
 
 
 @dataclass
@@ -50,12 +104,13 @@ class SingleExponential:
     grad_scale: float = 1.0
 
     def __call__(self, v_mem, spike_threshold):
+        if isinstance(spike_threshold, torch.Tensor):
+            fn = _single_exponential
+        else:
+            fn = _scripted(_single_exponential)
+            spike_threshold = float(spike_threshold)
         abs_width = spike_threshold * self.grad_width
-        return (
-            self.grad_scale
-            / abs_width
-            * torch.exp(-torch.abs(v_mem - spike_threshold) / abs_width)
-        )
+        return fn(v_mem, spike_threshold, -1.0 / abs_width, self.grad_scale / abs_width)
 
 @dataclass
 class PeriodicExponential:
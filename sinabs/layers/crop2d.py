@@ -34,7 +34,7 @@ class Cropping2dLayer(nn.Module):
         ]
         self.out_shape = crop_out.shape[1:]
         self.spikes_number = crop_out.abs().sum()
-        self.tw = len(crop_out)
+        self.tw = crop_out.shape[0]
         return crop_out
 
     def get_output_shape(self, input_shape: Tuple) -> Tuple:
@@ -1,8 +1,14 @@
+from functools import lru_cache
 from typing import Union, Optional
 import torch
+from . import functional
 from .lif import LIF
 from .reshape import SqueezeMixin
 
+# With min_v_mem, torch.compile unrolls the time loop. Beyond this number of
+# time steps compilation gets prohibitively slow and the eager loop is used.
+MAX_UNROLLED_TIME_STEPS = 256
+
 
 class ExpLeak(LIF):
     """
@@ -29,6 +35,31 @@ class ExpLeak(LIF):
         When True, normalise input current by tau. This helps when training time constants.
     record_states: bool
         When True, will record all internal states such as v_mem or i_syn in a dictionary attribute `recordings`. Default is False.
+    state_dtype: torch.dtype or None
+        Data type of v_mem and of the computations. If None, inputs are processed in their common
+        dtype with the state, which is float32 by default, so half precision inputs are integrated
+        in float32. Setting a half precision dtype explicitly halves the memory traffic, but also
+        quantizes the decay factor, which noticeably changes the dynamics for large tau_mem.
+        Half precision state needs a backend with float16/bfloat16 kernels for lerp and
+        addcmul, which older PyTorch releases only provide on CUDA.
+    time_last: bool
+        When True, expect input of shape (batch, ..., time) instead of (batch, time, ...) and
+        return output in the same layout. This avoids transposing the data for the scan over time
+        and lets stateless layers that work on the last axis (e.g. Conv1d) stay in that layout.
+    compile_dynamics: bool
+        When True, run the dynamics through `torch.compile` (requires PyTorch 2.0 or newer).
+        Shapes are treated as static, so the time loop can be unrolled and fused, but every new
+        input shape triggers a recompilation. With `min_v_mem` set, inputs with more than
+        `MAX_UNROLLED_TIME_STEPS` time steps are not compiled. All ExpLeak layers share one
+        compiled function, whose cache holds one entry per combination of input shape, dtype,
+        `min_v_mem`, `norm_input`, `record_states` and `time_last`. Once this exceeds
+        `torch._dynamo.config.cache_size_limit` (8 by default), further combinations run
+        uncompiled. Default is False.
+    memory_efficient_grad: bool
+        Only applies without `min_v_mem`. When True, gradients are computed by a custom autograd
+        function that recomputes v_mem in the backward pass instead of storing intermediate
+        results. When False, plain autograd is used, which needs more memory but can be fused
+        with surrounding operations by `torch.compile`. Default is True.
     """
 
     def __init__(
@@ -39,6 +70,10 @@ class ExpLeak(LIF):
         min_v_mem: Optional[float] = None,
         norm_input: bool = False,
         record_states: bool = False,
+        state_dtype: Optional[torch.dtype] = None,
+        time_last: bool = False,
+        compile_dynamics: bool = False,
+        memory_efficient_grad: bool = True,
     ):
         super().__init__(
             tau_mem=tau_mem,
@@ -53,6 +88,84 @@ class ExpLeak(LIF):
             norm_input=norm_input,
             record_states=record_states,
         )
+        self.state_dtype = state_dtype
+        self.time_last = time_last
+        self.compile_dynamics = compile_dynamics
+        self.memory_efficient_grad = memory_efficient_grad
+        self._alpha_mem_cache = None
+
+    @property
+    def alpha_mem_calculated(self):
+        if self.train_alphas or (
+            torch.is_grad_enabled() and self.tau_mem.requires_grad
+        ):
+            return super().alpha_mem_calculated
+        # tau_mem is constant here, so only recompute alpha when tau_mem has
+        # been replaced, moved or modified in place since the last call
+        tau_mem = self.tau_mem
+        key = (tau_mem._version, tau_mem.device, tau_mem.dtype)
+        if (
+            self._alpha_mem_cache is None
+            or self._alpha_mem_cache[0] is not tau_mem
+            or self._alpha_mem_cache[1] != key
+        ):
+            alpha_mem = torch.exp(-1.0 / tau_mem.detach())
+            self._alpha_mem_cache = (tau_mem, key, alpha_mem)
+        return self._alpha_mem_cache[2]
+
+    def forward(self, input_data: torch.Tensor) -> torch.Tensor:
+        """
+        Forward pass with given data.
+
+        Parameters:
+            input_current : torch.Tensor
+                Data to be processed. Expected shape: (batch, time, ...),
+                or (batch, ..., time) if `time_last` is True.
+
+        Returns:
+            torch.Tensor
+                Output data. Same shape as `input_data`.
+        """
+        if self.time_last:
+            batch_size, *trailing_dim, time_steps = input_data.shape
+        else:
+            batch_size, time_steps, *trailing_dim = input_data.shape
+
+        # Ensure the neuron state are initialized. v_mem is the only state, so
+        # one shape comparison covers both the uninitialised and reshaped case.
+        state_shape = (batch_size, *trailing_dim)
+        if self.v_mem.shape != state_shape:
+            self.init_state_with_shape(state_shape)
+
+        if self.state_dtype is not None:
+            dtype = self.state_dtype
+        else:
+            dtype = torch.promote_types(input_data.dtype, self.v_mem.dtype)
+        if self.v_mem.dtype != dtype:
+            self.v_mem = self.v_mem.to(dtype)
+
+        if self.compile_dynamics and (
+            self.min_v_mem is None or time_steps <= MAX_UNROLLED_TIME_STEPS
+        ):
+            forward_fn = _compiled_exp_leak_forward()
+        else:
+            forward_fn = functional.exp_leak_forward
+
+        v_mem, state, recordings = forward_fn(
+            input_data=input_data.to(dtype),
+            alpha_mem=self.alpha_mem_calculated.to(dtype),
+            state=dict(self.named_buffers()),
+            min_v_mem=self.min_v_mem,
+            norm_input=self.norm_input,
+            record_states=self.record_states,
+            time_last=self.time_last,
+            memory_efficient_grad=self.memory_efficient_grad,
+        )
+        self.v_mem = state["v_mem"]
+        self.recordings = recordings
+
+        self.firing_rate = v_mem.sum() / v_mem.numel()
+        return v_mem
 
     @property
     def _param_dict(self) -> dict:
@@ -62,17 +175,38 @@ class ExpLeak(LIF):
         param_dict.pop("reset_fn")
         param_dict.pop("surrogate_grad_fn")
         param_dict.pop("spike_threshold")
+        param_dict.update(
+            state_dtype=self.state_dtype,
+            time_last=self.time_last,
+            compile_dynamics=self.compile_dynamics,
+            memory_efficient_grad=self.memory_efficient_grad,
+        )
         return param_dict
 
 
+@lru_cache(maxsize=None)
+def _compiled_exp_leak_forward():
+    if not hasattr(torch, "compile"):
+        raise RuntimeError("`compile_dynamics` requires PyTorch 2.0 or newer.")
+    return torch.compile(functional.exp_leak_forward, dynamic=False)
+
+
 class ExpLeakSqueeze(ExpLeak, SqueezeMixin):
     """
     Same as parent ExpLeak class, only takes in squeezed 4D input (Batch*Time, Channel, Height, Width)
     instead of 5D input (Batch, Time, Channel, Height, Width) in order to be compatible with
     layers that can only take a 4D input, such as convolutional and pooling layers.
+
+    If `num_timesteps` is given, the number of time steps is fixed, so with `compile_dynamics`
+    the time loop is compiled once for that length and only changes in batch size recompile.
     """
 
     def __init__(self, batch_size=None, num_timesteps=None, **kwargs):
+        if kwargs.get("time_last", False):
+            raise ValueError(
+                f"{self.__class__.__name__} unflattens time from the first dimension "
+                "and does not support `time_last`."
+            )
         super().__init__(**kwargs)
         self.squeeze_init(batch_size, num_timesteps)
 
@@ -1,2 +1,3 @@
 from .alif import alif_forward, alif_recurrent
 from .lif import lif_forward, lif_recurrent
+from .exp_leak import exp_leak_forward
@@ -0,0 +1,216 @@
+from functools import lru_cache
+import torch
+from torch.autograd.function import once_differentiable
+from typing import Optional, Tuple
+
+
+def linear_scan(
+    input_data: torch.Tensor,
+    alpha: torch.Tensor,
+    v_init: torch.Tensor,
+    time_dim: int = 1,
+) -> torch.Tensor:
+    """
+    Evaluate the recurrence v(t) = alpha * v(t-1) + input_data(t) along
+    `time_dim` for all time steps at once, starting from `v_init`.
+
+    Uses a log-depth prefix scan, so the number of kernels launched grows with
+    log2(time_steps) instead of time_steps. Only powers of alpha <= 1 are
+    multiplied, which keeps the scan numerically stable for long sequences.
+    """
+    v_mem = torch.cat((v_init.unsqueeze(time_dim), input_data), dim=time_dim)
+    num_steps = v_mem.shape[time_dim]
+    span = 1
+    while span < num_steps:
+        decayed = torch.addcmul(
+            v_mem.narrow(time_dim, span, num_steps - span),
+            alpha**span,
+            v_mem.narrow(time_dim, 0, num_steps - span),
+        )
+        v_mem = torch.cat((v_mem.narrow(time_dim, 0, span), decayed), dim=time_dim)
+        span *= 2
+    return v_mem.narrow(time_dim, 1, num_steps - 1)
+
+
+class LinearScan(torch.autograd.Function):
+    """
+    `linear_scan` with a hand-written backward pass. Only the inputs are
+    saved, instead of the intermediate tensors of every scan stage, and
+    v_mem is recomputed in the backward pass if the gradient for alpha is
+    needed. This trades one extra scan for a much smaller memory footprint.
+
+    Custom autograd functions are opaque to TorchInductor, so under
+    `torch.compile` the scan can not be fused with surrounding operations.
+    """
+
+    @staticmethod
+    def forward(ctx, input_data, alpha, v_init, time_dim: int):
+        ctx.save_for_backward(input_data, alpha, v_init)
+        ctx.time_dim = time_dim
+        return linear_scan(input_data, alpha, v_init, time_dim)
+
+    @staticmethod
+    @once_differentiable
+    def backward(ctx, grad_output):
+        input_data, alpha, v_init = ctx.saved_tensors
+        time_dim = ctx.time_dim
+        num_steps = input_data.shape[time_dim]
+
+        # The gradient w.r.t. input_data(t) accumulates backwards in time:
+        # grad(t) = grad_output(t) + alpha * grad(t+1)
+        grad_input = linear_scan(
+            grad_output.flip(time_dim), alpha, torch.zeros_like(v_init), time_dim
+        ).flip(time_dim)
+
+        grad_alpha = grad_v_init = None
+        if ctx.needs_input_grad[1]:
+            with torch.no_grad():
+                v_mem = linear_scan(input_data, alpha, v_init, time_dim)
+            v_previous = torch.cat(
+                (v_init.unsqueeze(time_dim), v_mem.narrow(time_dim, 0, num_steps - 1)),
+                dim=time_dim,
+            )
+            grad_alpha = grad_input * v_previous
+            if alpha.ndim == 0:
+                grad_alpha = grad_alpha.sum()
+            else:
+                grad_alpha = grad_alpha.sum_to_size(alpha.shape)
+        if ctx.needs_input_grad[2]:
+            grad_v_init = alpha * grad_input.narrow(time_dim, 0, 1)
+            grad_v_init = grad_v_init.squeeze(time_dim)
+
+        return grad_input, grad_alpha, grad_v_init, None
+
+
+def _clipped_step(
+    v_mem: torch.Tensor,
+    input_data: torch.Tensor,
+    alpha: torch.Tensor,
+    min_v_mem: float,
+    norm_input: bool,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Single time step of the ExpLeak dynamics with a lower bound on v_mem.
+    Returns the membrane potential before clipping, which is the layer
+    output, and the clipped one, which is carried over as state. Scripted
+    so that the elementwise chain can be fused into a single kernel.
+    """
+    if norm_input:
+        # alpha * v_mem + (1 - alpha) * input_data as a single kernel
+        v_mem = torch.lerp(input_data, v_mem, alpha)
+    else:
+        v_mem = torch.addcmul(input_data, alpha, v_mem)
+    return v_mem, torch.clamp_min(v_mem, min_v_mem)
+
+
+@lru_cache(maxsize=None)
+def _scripted_clipped_step():
+    # Scripted on first use, so that importing sinabs does not pay for it
+    return torch.jit.script(_clipped_step)
+
+
+def _is_compiling() -> bool:
+    is_compiling = getattr(getattr(torch, "compiler", None), "is_compiling", None)
+    if is_compiling is None:
+        # Releases before torch.compiler.is_compiling only expose it on dynamo
+        is_compiling = getattr(getattr(torch, "_dynamo", None), "is_compiling", None)
+    return is_compiling is not None and is_compiling()
+
+
+def exp_leak_forward(
+    input_data: torch.Tensor,
+    alpha_mem: torch.Tensor,
+    state: dict,
+    min_v_mem: Optional[float],
+    norm_input: bool,
+    record_states: bool = False,
+    time_last: bool = False,
+    memory_efficient_grad: bool = True,
+):
+    """
+    Leaky integration of `input_data` over all time steps.
+
+    The input is expected in shape (batch, time, ...), or (batch, ..., time)
+    if `time_last` is True, and the output has the same layout. `alpha_mem`
+    has to broadcast against a single time step, i.e. (batch, ...), and may
+    either include the batch dimension or cover the neuron dimensions only.
+    Without `min_v_mem` all time steps are computed at once with
+    `linear_scan`, otherwise the function steps through time. The function
+    only operates on tensors and therefore can be compiled with
+    `torch.compile` as a whole.
+    With `memory_efficient_grad`, the scan is differentiated by `LinearScan`,
+    which saves less memory for the backward pass, but can not be fused by
+    TorchInductor.
+
+    Returns:
+        The membrane potential trace, the new state and a dict of recordings.
+    """
+    time_dim = -1 if time_last else 1
+
+    if time_last and alpha_mem.ndim > 0:
+        # Per-neuron decay factors need to broadcast over the time axis
+        alpha_over_time = alpha_mem.unsqueeze(-1)
+    elif alpha_mem.ndim == state["v_mem"].ndim:
+        # Decay factors with a batch dimension need a time axis after it
+        alpha_over_time = alpha_mem.unsqueeze(1)
+    else:
+        alpha_over_time = alpha_mem
+
+    if min_v_mem is None:
+        if norm_input:
+            input_data = (1 - alpha_over_time) * input_data
+        if memory_efficient_grad and torch.is_grad_enabled():
+            v_mem = LinearScan.apply(
+                input_data, alpha_over_time, state["v_mem"], time_dim
+            )
+        else:
+            v_mem = linear_scan(input_data, alpha_over_time, state["v_mem"], time_dim)
+        # Copy so that the state does not keep the whole output alive
+        state = dict(v_mem=v_mem.select(time_dim, -1).clone())
+    else:
+        # Clipping makes the recurrence non-linear, so step through time
+        min_v_mem = float(min_v_mem)
+        # lerp does not promote types, so bring everything to a common dtype
+        dtype = torch.promote_types(input_data.dtype, state["v_mem"].dtype)
+        alpha_mem = alpha_mem.to(dtype)
+        v_clipped = state["v_mem"].to(dtype)
+        # TorchScript functions can not be traced by torch.compile
+        step_fn = _clipped_step if _is_compiling() else _scripted_clipped_step()
+        time_steps = input_data.shape[time_dim]
+        if torch.is_grad_enabled():
+            # Slice assignment would add a CopySlices node per step, each of
+            # which clones the full gradient in the backward pass
+            output_states = []
+            for step in range(time_steps):
+                v_mem, v_clipped = step_fn(
+                    v_clipped,
+                    input_data.select(time_dim, step).to(dtype),
+                    alpha_mem,
+                    min_v_mem,
+                    norm_input,
+                )
+                output_states.append(v_mem)
+            v_mem = torch.stack(output_states, time_dim)
+        else:
+            # Write every step straight into the output instead of stacking
+            v_mem = torch.empty_like(input_data, dtype=dtype)
+            for step in range(time_steps):
+                index = (..., step) if time_last else (slice(None), step)
+                v_mem[index], v_clipped = step_fn(
+                    v_clipped,
+                    input_data[index].to(dtype),
+                    alpha_mem,
+                    min_v_mem,
+                    norm_input,
+                )
+        state = dict(v_mem=v_clipped)
+
+    if record_states:
+        recorded_v_mem = v_mem.detach().clone()
+        if min_v_mem is not None:
+            recorded_v_mem.clamp_(min=min_v_mem)
+        record_dict = dict(v_mem=recorded_v_mem)
+    else:
+        record_dict = dict()
+
+    return v_mem, state, record_dict
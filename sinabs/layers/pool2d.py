@@ -36,9 +36,6 @@ class SpikingMaxPooling2dLayer(nn.Module):
         self.spikes_number = None
 
     def forward(self, binary_input):
-        # Determine no. of time steps from input
-        time_steps = len(binary_input)
-
         # Calculate the cumulative sum spikes of each neuron
         sum_count = torch.cumsum(binary_input, 0)
 
@@ -67,7 +64,7 @@ class SpikingMaxPooling2dLayer(nn.Module):
         max_input_sum = (max_input_sum >= max_sum).float() * original_max_input_sum
 
         self.spikes_number = max_input_sum.abs().sum()
-        self.tw = len(max_input_sum)
+        self.tw = max_input_sum.shape[0]
         return max_input_sum.float()  # Float is just to keep things compatible
 
     def get_output_shape(self, input_shape: Tuple) -> Tuple:
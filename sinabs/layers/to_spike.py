@@ -48,8 +48,10 @@ class Img2SpikeLayer(nn.Module):
         else:
             firing_probs = (img_input.abs() / self.norm) * (self.max_rate / 1000)
             spk_img = (random_tensor < firing_probs).float() * img_input.sign().float()
-        self.spikes_number = spk_img.abs().sum()
-        self.tw = len(spk_img)
+        # Spikes are binary (or ternary with negative spikes), so counting
+        # non-zero entries is enough and avoids materializing abs()
+        self.spikes_number = spk_img.count_nonzero().to(spk_img.dtype)
+        self.tw = spk_img.shape[0]
         return spk_img
 
     def get_output_shape(self, input_shape: Tuple):
@@ -97,7 +99,7 @@ class Sig2SpikeLayer(torch.nn.Module):
         """
         channels, time_steps = signal.shape
         if self.tw != 1:
-            signal = signal.view(-1, 1).repeat(1, self.tw).view(channels, -1)
+            signal = signal.reshape(-1, 1).repeat(1, self.tw).reshape(channels, -1)
         signal = signal.transpose(1, 0)
         if self.spk_out:
             random_tensor = (
@@ -105,10 +107,11 @@ class Sig2SpikeLayer(torch.nn.Module):
                 * self.norm_level
             )
             spk_sig = (random_tensor < signal).float()
+            self.spikes_number = spk_sig.count_nonzero().to(spk_sig.dtype)
         else:
             # If there is no conversion to spikes
             # just replicate the signal as current injection
             spk_sig = signal
+            self.spikes_number = spk_sig.abs().sum()
 
-        self.spikes_number = spk_sig.abs().sum()
         return spk_sig
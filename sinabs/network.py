@@ -3,12 +3,14 @@ import warnings
 import torch
 import torch.nn as nn
 import numpy as np
-import pandas as pd
-from typing import Optional, Union, List, Tuple, Dict
+from typing import Optional, Union, List, Tuple, Dict, TYPE_CHECKING
 from .utils import get_network_activations, get_activations
 from .layers import StatefulLayer
 from .synopcounter import SNNSynOpCounter
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 ArrayLike = Union[np.ndarray, List, Tuple]
 
 
@@ -190,7 +192,7 @@ class Network(torch.nn.Module):
                     i += 1
                 lyr.reset_states(randomize=randomize, value_ranges=vr)
 
-    def get_synops(self, num_evs_in=None) -> pd.DataFrame:
+    def get_synops(self, num_evs_in=None) -> "pd.DataFrame":
         """
         Please see docs for `sinabs.SNNSynOpCounter.get_synops()`.
         """
@@ -1,9 +1,12 @@
 import warnings
+from typing import TYPE_CHECKING
 
 import torch
 from sinabs.layers import NeuromorphicReLU
 from numpy import product
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def synops_hook(layer, inp, out):
@@ -57,7 +60,7 @@ class SNNSynOpCounter:
         handle = layer.register_forward_hook(synops_hook)
         self.handles.append(handle)
 
-    def get_synops(self) -> pd.DataFrame:
+    def get_synops(self) -> "pd.DataFrame":
         """
         Method to compute a table of synaptic operations for the latest forward pass.
 
@@ -73,6 +76,9 @@ class SNNSynOpCounter:
                 total duration of simulation,
                 number of synaptic operations per second.
         """
+        # Imported here so that importing sinabs does not pull in pandas
+        import pandas as pd
+
         d = {}
         scale_facts = []
         for i, lyr in enumerate(self.model.modules()):
@@ -49,7 +49,7 @@ def get_activations(torchanalog_model, tsrData, name_list=None):
 
 def get_network_activations(
     model: nn.Module, inp, name_list: List = None, bRate: bool = False
-) -> [np.ndarray]:
+) -> List[np.ndarray]:
     """
     Returns the activity of neurons in each layer of the network
 
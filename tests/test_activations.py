@@ -1,3 +1,4 @@
+import math
 import pytest
 import torch
 from sinabs.activation import (
@@ -6,6 +7,8 @@ from sinabs.activation import (
     MultiSpike,
     SingleSpike,
     SingleExponential,
+    Heaviside,
+    MultiGaussian,
 )
 
 
@@ -63,4 +66,35 @@ def test_periodic_exponential():
     grad_fn = PeriodicExponential(grad_width=0.1, grad_scale=1.0)
     x = torch.range(-5.0, 10.5, 0.01)
     # Must have 10 peaks
-    assert(torch.sum(grad_fn(x, 1.0) == 1) == 10)
\ No newline at end of file
+    assert(torch.sum(grad_fn(x, 1.0) == 1) == 10)
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.float64])
+@pytest.mark.parametrize("spike_threshold", [1.0, 2, torch.tensor([1.0, 1.5, 2.0])])
+def test_surrogate_gradients(spike_threshold, dtype):
+    if isinstance(spike_threshold, torch.Tensor):
+        spike_threshold = spike_threshold.to(dtype)
+    v_mem = torch.tensor([-1.0, 0.5, 1.9], dtype=dtype)
+    thr = torch.as_tensor(spike_threshold, dtype=dtype)
+
+    heaviside = Heaviside(window=0.5)(v_mem, spike_threshold)
+    expected = (v_mem >= thr - 0.5).to(dtype) / thr
+    assert heaviside.dtype == dtype
+    assert torch.allclose(heaviside, expected)
+
+    gaussian = MultiGaussian(mu=0.1, sigma=0.5, grad_scale=2.0)(v_mem, spike_threshold)
+    expected = (
+        torch.exp(-((v_mem - thr - 0.1) ** 2) / (2 * 0.5**2))
+        / math.sqrt(2 * math.pi)
+        / 0.5
+        * 2.0
+    )
+    assert gaussian.dtype == dtype
+    assert torch.allclose(gaussian, expected)
+
+    exponential = SingleExponential(grad_width=0.5, grad_scale=2.0)(
+        v_mem, spike_threshold
+    )
+    expected = 2.0 / (thr * 0.5) * torch.exp(-torch.abs(v_mem - thr) / (thr * 0.5))
+    assert exponential.dtype == dtype
+    assert torch.allclose(exponential, expected)
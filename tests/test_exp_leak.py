@@ -1,7 +1,24 @@
+import shutil
+import pytest
 import torch
 from sinabs.layers import ExpLeak, ExpLeakSqueeze
 
 
+def _reference_exp_leak(input_data, alpha, v_init, min_v_mem=None, norm_input=False):
+    """Step-by-step ExpLeak dynamics, returns the output and the final state."""
+    v_mem = v_init
+    output = []
+    for step in range(input_data.shape[1]):
+        if norm_input:
+            v_mem = alpha * v_mem + (1 - alpha) * input_data[:, step]
+        else:
+            v_mem = alpha * v_mem + input_data[:, step]
+        output.append(v_mem)
+        if min_v_mem is not None:
+            v_mem = torch.clamp(v_mem, min=min_v_mem)
+    return torch.stack(output, 1), v_mem
+
+
 def test_leaky_basic():
     time_steps = 100
     tau_mem = torch.tensor(30.0)
@@ -62,3 +79,332 @@ def test_leaky_v_mem_recordings():
     assert layer.recordings["v_mem"].shape == membrane_output.shape
     assert not layer.recordings["v_mem"].requires_grad
     assert "i_syn" not in layer.recordings.keys()
+
+
+def test_leaky_matches_step_by_step():
+    batch_size, time_steps = 3, 77
+    tau_mem = torch.rand(2, 7, 7) * 20 + 1
+    alpha = torch.exp(-1 / tau_mem)
+    input_current = torch.rand(batch_size, time_steps, 2, 7, 7)
+    layer = ExpLeak(tau_mem=tau_mem, norm_input=True)
+    layer(input_current)
+    v_init = layer.v_mem.clone()
+    membrane_output = layer(input_current)
+
+    expected, _ = _reference_exp_leak(input_current, alpha, v_init, norm_input=True)
+
+    assert torch.allclose(membrane_output, expected, atol=1e-6)
+
+
+def test_leaky_min_v_mem():
+    batch_size, time_steps = 3, 20
+    tau_mem = torch.tensor(10.0)
+    alpha = torch.exp(-1 / tau_mem)
+    input_current = torch.randn(batch_size, time_steps, 2, 7, 7)
+    layer = ExpLeak(tau_mem=tau_mem, min_v_mem=-0.2, record_states=True)
+    membrane_output = layer(input_current)
+
+    expected, v_mem = _reference_exp_leak(
+        input_current, alpha, torch.zeros(batch_size, 2, 7, 7), min_v_mem=-0.2
+    )
+
+    assert torch.allclose(membrane_output, expected, atol=1e-6)
+    assert torch.allclose(layer.v_mem, v_mem)
+    assert (layer.recordings["v_mem"] >= -0.2).all()
+
+
+def test_leaky_alpha_cache():
+    layer = ExpLeak(tau_mem=30.0)
+    layer.tau_mem.requires_grad_(False)
+
+    alpha = layer.alpha_mem_calculated
+    assert layer.alpha_mem_calculated is alpha
+
+    with torch.no_grad():
+        layer.tau_mem.fill_(10.0)
+    assert torch.isclose(layer.alpha_mem_calculated, torch.exp(torch.tensor(-0.1)))
+
+
+def test_leaky_min_v_mem_backward():
+    input_current = torch.randn(3, 20, 2, 7, 7, requires_grad=True)
+    layer = ExpLeak(tau_mem=10.0, min_v_mem=-0.2)
+    layer(input_current).sum().backward()
+
+    assert input_current.grad is not None
+    assert not torch.isnan(input_current.grad).any()
+    assert layer.tau_mem.grad is not None
+
+
+@pytest.mark.parametrize("min_v_mem", [None, -0.2])
+@pytest.mark.parametrize("grad_enabled", [True, False])
+def test_leaky_time_last(min_v_mem, grad_enabled):
+    batch_size, time_steps = 3, 20
+    tau_mem = torch.rand(2, 7) * 20 + 1
+    input_current = torch.randn(batch_size, time_steps, 2, 7)
+    input_time_first = input_current.clone().requires_grad_(grad_enabled)
+    input_time_last = input_current.movedim(1, -1).requires_grad_(grad_enabled)
+    layer = ExpLeak(tau_mem=tau_mem, min_v_mem=min_v_mem, norm_input=True)
+    layer_time_last = ExpLeak(
+        tau_mem=tau_mem, min_v_mem=min_v_mem, norm_input=True, time_last=True
+    )
+
+    with torch.set_grad_enabled(grad_enabled):
+        membrane_output = layer(input_time_first)
+        membrane_output_time_last = layer_time_last(input_time_last)
+
+    assert membrane_output_time_last.shape == (batch_size, 2, 7, time_steps)
+    assert torch.allclose(
+        membrane_output_time_last.movedim(-1, 1), membrane_output, atol=1e-6
+    )
+    assert torch.allclose(layer_time_last.v_mem, layer.v_mem, atol=1e-6)
+
+    if grad_enabled:
+        membrane_output.pow(2).sum().backward()
+        membrane_output_time_last.pow(2).sum().backward()
+        assert torch.allclose(
+            input_time_last.grad.movedim(-1, 1), input_time_first.grad, atol=1e-5
+        )
+
+
+def test_leaky_functional():
+    from sinabs.layers.functional import exp_leak_forward
+
+    batch_size, time_steps = 3, 20
+    input_current = torch.rand(batch_size, time_steps, 2, 7, 7)
+    layer = ExpLeak(tau_mem=30.0)
+    membrane_output = layer(input_current)
+
+    v_mem, state, recordings = exp_leak_forward(
+        input_data=input_current,
+        alpha_mem=torch.exp(torch.tensor(-1 / 30.0)),
+        state=dict(v_mem=torch.zeros(batch_size, 2, 7, 7)),
+        min_v_mem=None,
+        norm_input=False,
+    )
+
+    assert torch.allclose(v_mem, membrane_output)
+    assert torch.allclose(state["v_mem"], layer.v_mem)
+    assert recordings == dict()
+
+
+def test_leaky_min_v_mem_norm_input():
+    batch_size, time_steps = 3, 20
+    tau_mem = torch.rand(2, 7, 7) * 20 + 1
+    alpha = torch.exp(-1 / tau_mem)
+    input_current = torch.randn(batch_size, time_steps, 2, 7, 7)
+    layer = ExpLeak(tau_mem=tau_mem, min_v_mem=-0.2, norm_input=True)
+    membrane_output = layer(input_current)
+
+    expected, _ = _reference_exp_leak(
+        input_current,
+        alpha,
+        torch.zeros(batch_size, 2, 7, 7),
+        min_v_mem=-0.2,
+        norm_input=True,
+    )
+
+    assert torch.allclose(membrane_output, expected, atol=1e-6)
+
+
+# TorchInductor generates C++ code for CPU tensors and needs a compiler for it
+@pytest.mark.skipif(
+    not hasattr(torch, "compile")
+    or not any(shutil.which(cxx) for cxx in ("g++", "clang++", "c++")),
+    reason="Requires torch.compile and a C++ compiler",
+)
+def test_leaky_compile_dynamics():
+    input_current = torch.rand(3, 10, 2, 7)
+    layer = ExpLeak(tau_mem=30.0, min_v_mem=-0.2)
+    layer_compiled = ExpLeak(tau_mem=30.0, min_v_mem=-0.2, compile_dynamics=True)
+
+    assert torch.allclose(layer_compiled(input_current), layer(input_current))
+    assert torch.allclose(layer_compiled.v_mem, layer.v_mem)
+
+
+def test_leaky_compile_dynamics_long_sequence(monkeypatch):
+    import sinabs.layers.exp_leak as exp_leak
+    from sinabs.layers.exp_leak import MAX_UNROLLED_TIME_STEPS
+
+    def compiled_exp_leak_forward():
+        raise AssertionError("Long sequences should not be compiled")
+
+    monkeypatch.setattr(
+        exp_leak, "_compiled_exp_leak_forward", compiled_exp_leak_forward
+    )
+    layer = ExpLeak(tau_mem=30.0, min_v_mem=-0.2, compile_dynamics=True)
+
+    # Long sequences fall back to the eager loop and are never compiled
+    layer(torch.rand(2, MAX_UNROLLED_TIME_STEPS + 1, 3))
+    layer(torch.rand(2, MAX_UNROLLED_TIME_STEPS + 2, 3))
+
+
+def test_leaky_compiling_uses_plain_step(monkeypatch):
+    dynamo = pytest.importorskip("torch._dynamo")
+    from sinabs.layers.functional import exp_leak as functional_exp_leak
+
+    # Emulate a release that only has torch._dynamo.is_compiling
+    if hasattr(torch, "compiler"):
+        monkeypatch.delattr(torch.compiler, "is_compiling", raising=False)
+    monkeypatch.setattr(dynamo, "is_compiling", lambda: True, raising=False)
+
+    calls = []
+    clipped_step = functional_exp_leak._clipped_step
+
+    def recording_step(*args):
+        calls.append(args)
+        return clipped_step(*args)
+
+    monkeypatch.setattr(functional_exp_leak, "_clipped_step", recording_step)
+
+    functional_exp_leak.exp_leak_forward(
+        input_data=torch.rand(2, 5, 3),
+        alpha_mem=torch.tensor(0.9),
+        state=dict(v_mem=torch.zeros(2, 3)),
+        min_v_mem=-0.2,
+        norm_input=False,
+    )
+    # TorchScript functions can not be traced, so the plain step must be used
+    assert len(calls) == 5
+
+
+@pytest.mark.parametrize("min_v_mem", [None, -0.2])
+@pytest.mark.parametrize("tau_mem", [10.0, 1000.0])
+def test_leaky_low_precision(min_v_mem, tau_mem):
+    input_current = torch.rand(3, 50, 2, 7).bfloat16()
+    layer = ExpLeak(tau_mem=tau_mem, min_v_mem=min_v_mem, norm_input=True)
+    layer_bf16 = ExpLeak(tau_mem=tau_mem, min_v_mem=min_v_mem, norm_input=True)
+
+    membrane_output = layer(input_current.float())
+    membrane_output_bf16 = layer_bf16(input_current)
+
+    # Without an explicit state_dtype, half precision input is integrated in
+    # float32, so that alpha close to 1 is not rounded to 1 or to a coarse step
+    assert membrane_output_bf16.dtype == torch.float32
+    assert layer_bf16.v_mem.dtype == torch.float32
+    assert membrane_output.abs().max() > 0
+    assert torch.allclose(membrane_output_bf16, membrane_output)
+
+
+def _supports_bfloat16(device):
+    # Older releases lack BFloat16 kernels for some of these ops on CPU
+    try:
+        x = torch.ones(2, dtype=torch.bfloat16, device=device)
+        torch.lerp(x, x, x).addcmul(x, x).clamp_min(0.0).pow(2)
+    except RuntimeError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize("device", ["cpu", "cuda"])
+@pytest.mark.parametrize("min_v_mem", [None, -0.2])
+def test_leaky_low_precision_state_dtype(min_v_mem, device):
+    if device == "cuda" and not torch.cuda.is_available():
+        pytest.skip("Requires CUDA")
+    if not _supports_bfloat16(device):
+        pytest.skip(f"No BFloat16 kernels on {device} in this torch release")
+
+    input_current = torch.rand(3, 50, 2, 7, device=device)
+    layer = ExpLeak(tau_mem=10.0, min_v_mem=min_v_mem, norm_input=True).to(device)
+    layer_bf16 = ExpLeak(
+        tau_mem=10.0, min_v_mem=min_v_mem, norm_input=True, state_dtype=torch.bfloat16
+    ).to(device)
+
+    membrane_output = layer(input_current)
+    membrane_output_bf16 = layer_bf16(input_current)
+
+    assert membrane_output_bf16.dtype == torch.bfloat16
+    assert layer_bf16.v_mem.dtype == torch.bfloat16
+    assert torch.allclose(membrane_output_bf16.float(), membrane_output, atol=5e-2)
+
+
+def test_leaky_state_dtype():
+    input_current = torch.rand(3, 50, 2, 7)
+    layer = ExpLeak(tau_mem=10.0, state_dtype=torch.float64)
+    membrane_output = layer(input_current)
+
+    assert membrane_output.dtype == torch.float64
+    assert layer.v_mem.dtype == torch.float64
+
+
+@pytest.mark.parametrize("time_last", [False, True])
+@pytest.mark.parametrize("tau_mem", [torch.tensor(10.0), torch.rand(2, 7) * 20 + 1])
+def test_leaky_memory_efficient_grad(time_last, tau_mem):
+    input_shape = (3, 2, 7, 20) if time_last else (3, 20, 2, 7)
+    input_current = torch.rand(*input_shape)
+    v_init = torch.rand(3, 2, 7)
+
+    grads = []
+    for memory_efficient_grad in (True, False):
+        layer = ExpLeak(
+            tau_mem=tau_mem,
+            train_alphas=True,
+            norm_input=True,
+            time_last=time_last,
+            memory_efficient_grad=memory_efficient_grad,
+        )
+        inp = input_current.clone().requires_grad_(True)
+        layer.v_mem = v_init.clone().requires_grad_(True)
+        v_init_leaf = layer.v_mem
+        layer(inp).pow(2).sum().backward()
+        grads.append((inp.grad, layer.alpha_mem.grad, v_init_leaf.grad))
+
+    for grad_efficient, grad_autograd in zip(*grads):
+        assert torch.allclose(grad_efficient, grad_autograd, rtol=1e-4, atol=1e-5)
+
+
+def test_leaky_alpha_cache_replaced_tau():
+    layer = ExpLeak(tau_mem=30.0)
+    layer.tau_mem.requires_grad_(False)
+    layer.alpha_mem_calculated
+
+    # A new parameter must invalidate the cache, even if it reuses the memory
+    del layer.tau_mem
+    layer.tau_mem = torch.nn.Parameter(torch.tensor(10.0), requires_grad=False)
+    assert torch.isclose(layer.alpha_mem_calculated, torch.exp(torch.tensor(-0.1)))
+
+
+def test_leaky_min_v_mem_no_grad():
+    input_current = torch.randn(3, 20, 2, 7)
+    layer = ExpLeak(tau_mem=10.0, min_v_mem=-0.2)
+    membrane_output = layer(input_current)
+    v_mem = layer.v_mem.clone()
+
+    layer.reset_states()
+    with torch.no_grad():
+        membrane_output_no_grad = layer(input_current)
+
+    assert torch.allclose(membrane_output_no_grad, membrane_output)
+    assert torch.allclose(layer.v_mem, v_mem)
+
+
+def test_leaky_squeezed_time_last():
+    with pytest.raises(ValueError):
+        ExpLeakSqueeze(tau_mem=30.0, batch_size=10, time_last=True)
+
+
+@pytest.mark.parametrize("min_v_mem", [None, -0.2])
+def test_leaky_functional_batched_alpha(min_v_mem):
+    from sinabs.layers.functional import exp_leak_forward
+
+    # Batch size equals a scan span + 1, where a missing time axis on alpha
+    # would broadcast silently against the wrong dimension
+    batch_size, time_steps = 3, 4
+    input_current = torch.rand(batch_size, time_steps, 5)
+    alpha = torch.rand(batch_size, 5)
+
+    v_mem, _, _ = exp_leak_forward(
+        input_data=input_current,
+        alpha_mem=alpha,
+        state=dict(v_mem=torch.zeros(batch_size, 5)),
+        min_v_mem=min_v_mem,
+        norm_input=True,
+    )
+
+    expected, _ = _reference_exp_leak(
+        input_current,
+        alpha,
+        torch.zeros(batch_size, 5),
+        min_v_mem=min_v_mem,
+        norm_input=True,
+    )
+    assert torch.allclose(v_mem, expected, atol=1e-6)
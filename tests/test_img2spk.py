@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_img2spk():
     import torch
     from sinabs.layers import Img2SpikeLayer
@@ -13,3 +16,25 @@ def test_img2spk():
     spks = lyr(img)
 
     assert spks.shape == (10, 2, 64, 64)
+
+
+@pytest.mark.parametrize("negative_spikes", [False, True])
+def test_img2spk_spikes_number(negative_spikes):
+    import torch
+    from sinabs.layers import Img2SpikeLayer
+
+    lyr = Img2SpikeLayer(
+        image_shape=(2, 16, 16),
+        tw=10,
+        max_rate=500,
+        negative_spikes=negative_spikes,
+    )
+
+    img = torch.rand(2, 16, 16) * 255
+    if negative_spikes:
+        img = img * torch.randn(2, 16, 16).sign()
+
+    spks = lyr(img)
+
+    assert lyr.spikes_number.dtype == spks.dtype
+    assert lyr.spikes_number == spks.abs().sum()
@@ -13,3 +13,30 @@ def test_forward():
     sig = torch.tensor([[1.0, 0.5, 0.25]] * channels)
     spk = lyr(sig)
     assert spk.shape == (tw * 3, channels)
+
+
+def test_forward_non_contiguous():
+    import torch
+    from sinabs.layers import Sig2SpikeLayer
+
+    channels = 4
+    tw = 5
+
+    lyr = Sig2SpikeLayer(channels_in=channels, tw=tw, spk_out=False)
+
+    sig = torch.rand(3, channels).t()
+    assert not sig.is_contiguous()
+    spk = lyr(sig)
+    assert spk.shape == (tw * 3, channels)
+    assert torch.equal(spk[:tw], sig[:, :1].t().expand(tw, channels))
+
+
+def test_forward_spikes_number():
+    import torch
+    from sinabs.layers import Sig2SpikeLayer
+
+    lyr = Sig2SpikeLayer(channels_in=4, tw=5)
+
+    spk = lyr(torch.rand(4, 3))
+    assert lyr.spikes_number.dtype == spk.dtype
+    assert lyr.spikes_number == spk.abs().sum()